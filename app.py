@@ -1,3 +1,5 @@
+from dataclasses import asdict
+
 import pandas as pd
 import streamlit as st
 # ssh -i C:\Users\User\.ssh\aws_ec2_key.pem ec2-user@54.82.56.2
@@ -12,9 +14,45 @@ st.title("🏥 Nurse Scheduling — Weekly (Mon–Sun) + OR-Tools CP-SAT")
 def load_csv(path: str) -> pd.DataFrame:
     return pd.read_csv(path)
 
+@st.cache_data
 def csv_bytes(df: pd.DataFrame) -> bytes:
     return df.to_csv(index=False).encode("utf-8")
 
+@st.cache_data(show_spinner=False)
+def cached_solve(
+    nurses_df: pd.DataFrame,
+    rooms_df: pd.DataFrame,
+    demand_df: pd.DataFrame,
+    pref_df: pd.DataFrame,
+    locks_df: pd.DataFrame,
+    days: list,
+    shifts: list,
+    allow_overstaff: bool,
+    weights: dict,
+    time_limit_seconds: int,
+    target_shifts_per_nurse_week,
+    enforce_rest_night_to_day: bool,
+    charge_rooms_tags: tuple,
+    require_cnor_in_or: bool,
+):
+    # Plain dict/tuple args keep the cache key hashable; identical inputs skip the re-solve
+    return solve_schedule_ortools(
+        nurses_df=nurses_df,
+        rooms_df=rooms_df,
+        demand_df=demand_df,
+        pref_df=pref_df,
+        locks_df=locks_df,
+        days=days,
+        shifts=shifts,
+        allow_overstaff=allow_overstaff,
+        weights=Weights(**weights),
+        time_limit_seconds=time_limit_seconds,
+        target_shifts_per_nurse_week=target_shifts_per_nurse_week,
+        enforce_rest_night_to_day=enforce_rest_night_to_day,
+        charge_rooms_tags=frozenset(charge_rooms_tags),
+        require_cnor_in_or=require_cnor_in_or,
+    )
+
 # Load
 nurses = load_csv(f"{DATA_DIR}/nurses.csv")
 rooms = load_csv(f"{DATA_DIR}/facilities.csv")
@@ -86,7 +124,7 @@ if st.button("🚀 Solve weekly schedule", type="primary"):
     if not days or not shifts:
         st.error("Select at least one day and one shift.")
     else:
-        schedule_df, meta = solve_schedule_ortools(
+        schedule_df, meta = cached_solve(
             nurses_df=pd.DataFrame(nurses_edit),
             rooms_df=pd.DataFrame(rooms_edit),
             demand_df=pd.DataFrame(demand_edit),
@@ -95,11 +133,11 @@ if st.button("🚀 Solve weekly schedule", type="primary"):
             days=days,
             shifts=shifts,
             allow_overstaff=allow_overstaff,
-            weights=weights,
+            weights=asdict(weights),
             time_limit_seconds=int(time_limit),
             target_shifts_per_nurse_week=(int(target_week) if target_week is not None else None),
             enforce_rest_night_to_day=enforce_rest,
-            charge_rooms_tags=frozenset({"ICU","ER"}) if charge_req else frozenset(),
+            charge_rooms_tags=("ER","ICU") if charge_req else (),
             require_cnor_in_or=cnor_req,
         )
 
@@ -120,9 +158,8 @@ if st.button("🚀 Solve weekly schedule", type="primary"):
 
         # quick gap check
         tmp = pd.DataFrame(schedule_edit).copy()
-        tmp["assigned_count"] = tmp["assigned_nurses"].fillna("").apply(
-            lambda s: 0 if str(s).strip()=="" else len([x for x in str(s).split(";") if x.strip()])
-        )
+        # count non-blank ";"-separated IDs: one match per token with a non-space char
+        tmp["assigned_count"] = tmp["assigned_nurses"].fillna("").astype(str).str.count(r"(?:^|;)\s*[^;\s]")
         tmp["gap"] = tmp["required_nurses"] - tmp["assigned_count"]
 
         st.markdown("## Quick coverage check")
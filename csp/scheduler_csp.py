@@ -1,4 +1,5 @@
 import csv
+import numpy as np
 from constraint import Problem, AllDifferentConstraint
 
 NURSE_CSV = "../hospital/nurses.csv"
@@ -6,55 +7,97 @@ FACILITY_CSV = "../hospital/facilities.csv"
 
 SHIFT_HOURS = 6.0  # 08:00–14:00
 
+def parse_semicolon_set(s):
+    """'RN; ICU;' -> frozenset({'RN', 'ICU'}) in one pass (empty/blank -> empty set)."""
+    return frozenset(filter(None, (q.strip() for q in s.split(";")))) if s else frozenset()
+
 def load_nurses(path):
+    # csv.reader + header positions instead of DictReader (no per-row dict)
     nurses = {}
     with open(path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader)
+        width = len(header)
+        col = {name: i for i, name in enumerate(header)}
+        i_id, i_name, i_degree = col["nurse_id"], col["full_name"], col["degree"]
+        i_cert, i_hours, i_quals = col["certification"], col["max_daily_hours"], col["qualifications"]
         for row in reader:
-            quals = row["qualifications"].split(";") if row["qualifications"] else []
-            nurses[row["nurse_id"]] = {
-                "full_name": row["full_name"],
-                "degree": row["degree"],
-                "certification": row["certification"],
-                "max_daily_hours": float(row["max_daily_hours"]),
-                "qualifications": set(q.strip() for q in quals if q.strip()),
+            if not row:
+                continue
+            if len(row) < width:
+                # short row: missing trailing fields are None, as DictReader did
+                row += [None] * (width - len(row))
+            nurses[row[i_id]] = {
+                "full_name": row[i_name],
+                "degree": row[i_degree],
+                "certification": row[i_cert],
+                "max_daily_hours": float(row[i_hours]),
+                "qualifications": parse_semicolon_set(row[i_quals]),
             }
     return nurses
 
 def load_rooms(path):
     rooms = []
     with open(path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader)
+        width = len(header)
+        col = {name: i for i, name in enumerate(header)}
+        i_id, i_name, i_start, i_end = col["room_id"], col["room_name"], col["shift_start"], col["shift_end"]
+        i_min, i_reqs = col["min_nurses"], col["required_qualifications"]
         for row in reader:
-            reqs = row["required_qualifications"].split(";") if row["required_qualifications"] else []
+            if not row:
+                continue
+            if len(row) < width:
+                # short row: missing trailing fields are None, as DictReader did
+                row += [None] * (width - len(row))
             rooms.append({
-                "room_id": row["room_id"],
-                "room_name": row["room_name"],
-                "shift_start": row["shift_start"],
-                "shift_end": row["shift_end"],
-                "min_nurses": int(row["min_nurses"]),
-                "required_qualifications": set(q.strip() for q in reqs if q.strip()),
+                "room_id": row[i_id],
+                "room_name": row[i_name],
+                "shift_start": row[i_start],
+                "shift_end": row[i_end],
+                "min_nurses": int(row[i_min]),
+                "required_qualifications": parse_semicolon_set(row[i_reqs]),
             })
     return rooms
 
+def qualification_masks(qual_sets, qbit, words):
+    """
+    Encode each qualification set as a row of uint64 bitmask words
+    (qualification with bit b sets bit b % 64 of word b // 64).
+    """
+    masks = np.zeros((len(qual_sets), words), dtype=np.uint64)
+    for i, quals in enumerate(qual_sets):
+        for q in quals:
+            b = qbit[q]
+            masks[i, b // 64] |= np.uint64(1 << (b % 64))
+    return masks
+
 def build_domains(nurses, rooms):
     """
     Build domains for each room:
       - only nurses whose qualifications cover room requirements
       - only nurses whose max_daily_hours >= SHIFT_HOURS
+    Qualifications are bitmasks, so "covers" is (room & nurse) == room,
+    evaluated for all room x nurse pairs at once.
     """
+    nurse_ids = list(nurses)
+    all_quals = {q for n in nurses.values() for q in n["qualifications"]}
+    all_quals.update(q for room in rooms for q in room["required_qualifications"])
+    qbit = {q: b for b, q in enumerate(sorted(all_quals))}
+    words = max(1, (len(qbit) + 63) // 64)
+
+    nurse_masks = qualification_masks([n["qualifications"] for n in nurses.values()], qbit, words)
+    room_masks = qualification_masks([room["required_qualifications"] for room in rooms], qbit, words)
+    hours = np.array([n["max_daily_hours"] for n in nurses.values()], dtype=float)
+
+    # feas[r, n]: room r's requirements are a subset of nurse n's qualifications
+    covered = ((room_masks[:, None, :] & nurse_masks[None, :, :]) == room_masks[:, None, :]).all(axis=2)
+    feas = covered & ~(hours < SHIFT_HOURS)[None, :]
+
     domains = {}
-    for room in rooms:
-        rid = room["room_id"]
-        reqs = room["required_qualifications"]
-        domain = []
-        for nid, n in nurses.items():
-            if n["max_daily_hours"] < SHIFT_HOURS:
-                continue
-            if not reqs.issubset(n["qualifications"]):
-                continue
-            domain.append(nid)
-        domains[rid] = domain
+    for r, room in enumerate(rooms):
+        domains[room["room_id"]] = [nurse_ids[i] for i in np.flatnonzero(feas[r])]
     return domains
 
 def solve_schedule(nurses, rooms):
@@ -81,13 +124,11 @@ def solve_schedule(nurses, rooms):
     room_ids = [r["room_id"] for r in rooms]
     problem.addConstraint(AllDifferentConstraint(), room_ids)
 
-    # Solve
-    solutions = problem.getSolutions()
-    if not solutions:
+    # Solve: stop at the first solution instead of enumerating all of them
+    schedule = problem.getSolution()
+    if schedule is None:
         raise RuntimeError("No feasible schedule found given current constraints.")
 
-    # You can choose any solution; here we pick the first
-    schedule = solutions[0]
     return schedule
 
 def main():
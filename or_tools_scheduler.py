@@ -1,7 +1,10 @@
 from __future__ import annotations
+import os
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, Set, Optional
+from typing import Dict, FrozenSet, List, Tuple, Set, Optional
 
+import numpy as np
 import pandas as pd
 from ortools.sat.python import cp_model
 
@@ -15,24 +18,96 @@ class Weights:
     w_weekend: int = 2  # penalty per weekend assignment (optional knob)
 
 
-def parse_semicolon_set(s: str) -> Set[str]:
-    if pd.isna(s) or not str(s).strip():
-        return set()
-    return {x.strip() for x in str(s).split(";") if x.strip()}
+def parse_semicolon_column(col: pd.Series) -> List[FrozenSet[str]]:
+    """Parse a column of "RN; ICU" strings into frozensets (blank/NaN -> empty)."""
+    parts = col.fillna("").astype(str).str.split(";")
+    return [frozenset(t.strip() for t in lst if t.strip()) for lst in parts]
 
 
 def pref_lookup(pref_df: pd.DataFrame) -> Dict[Tuple[str, str, str], int]:
-    m: Dict[Tuple[str, str, str], int] = {}
-    for _, r in pref_df.iterrows():
-        m[(str(r["nurse_id"]), str(r["day"]), str(r["shift"]))] = int(r["preference"])
-    return m
+    return {
+        (str(n), str(d), str(sh)): int(p)
+        for n, d, sh, p in zip(
+            pref_df["nurse_id"].to_numpy(),
+            pref_df["day"].to_numpy(),
+            pref_df["shift"].to_numpy(),
+            pref_df["preference"].to_numpy(),
+        )
+    }
 
 
 def locks_lookup(locks_df: pd.DataFrame) -> Dict[Tuple[str, str, str, str], int]:
-    m: Dict[Tuple[str, str, str, str], int] = {}
-    for _, r in locks_df.iterrows():
-        m[(str(r["day"]), str(r["shift"]), str(r["room_id"]), str(r["nurse_id"]))] = int(r.get("locked", 0))
-    return m
+    if "locked" in locks_df.columns:
+        locked = locks_df["locked"].fillna(0).astype(int).to_numpy()
+    else:
+        locked = [0] * len(locks_df)
+    return {
+        (str(d), str(sh), str(rid), str(n)): int(lk)
+        for d, sh, rid, n, lk in zip(
+            locks_df["day"].to_numpy(),
+            locks_df["shift"].to_numpy(),
+            locks_df["room_id"].to_numpy(),
+            locks_df["nurse_id"].to_numpy(),
+            locked,
+        )
+    }
+
+
+def greedy_assignment(
+    feas: np.ndarray,
+    demand: np.ndarray,
+    max_per_day: np.ndarray,
+    max_per_week: np.ndarray,
+    locked: np.ndarray,
+    night_shift: int = -1,
+    day_shift: int = -1,
+) -> np.ndarray:
+    """
+    Fast first-fit schedule used as a CP-SAT warm start.
+    feas[n, r] marks qualified nurse/room pairs, demand is indexed [day, room, shift]
+    and locked holds (nurse, room, shift, day) rows that are taken first.
+    Each (day, shift, room) is then filled in order with the first feasible nurses
+    that still have daily/weekly capacity and are not already on that shift.
+    If night_shift and day_shift are >= 0, a nurse who worked Night is not put on
+    Day the next day. Charge/CNOR rules are not considered.
+    Returns a bool array assign[nurse, room, shift, day].
+    """
+    n_nurses, n_rooms = feas.shape
+    n_days, _, n_shifts = demand.shape
+    assign = np.zeros((n_nurses, n_rooms, n_shifts, n_days), dtype=np.bool_)
+    per_day = np.zeros((n_nurses, n_days), dtype=np.int32)
+    per_week = np.zeros(n_nurses, dtype=np.int32)
+    on_shift = np.zeros((n_nurses, n_days, n_shifts), dtype=np.bool_)
+    served = np.zeros((n_days, n_rooms, n_shifts), dtype=np.int32)
+
+    for k in range(locked.shape[0]):
+        ni, ri, si, di = locked[k, 0], locked[k, 1], locked[k, 2], locked[k, 3]
+        if feas[ni, ri] and not assign[ni, ri, si, di]:
+            assign[ni, ri, si, di] = True
+            per_day[ni, di] += 1
+            per_week[ni] += 1
+            on_shift[ni, di, si] = True
+            served[di, ri, si] += 1
+
+    rest_rule = night_shift >= 0 and day_shift >= 0
+    for di in range(n_days):
+        for si in range(n_shifts):
+            for ri in range(n_rooms):
+                for ni in range(n_nurses):
+                    if served[di, ri, si] >= demand[di, ri, si]:
+                        break
+                    if not feas[ni, ri] or assign[ni, ri, si, di] or on_shift[ni, di, si]:
+                        continue
+                    if per_day[ni, di] >= max_per_day[ni] or per_week[ni] >= max_per_week[ni]:
+                        continue
+                    if rest_rule and si == day_shift and di > 0 and on_shift[ni, di - 1, night_shift]:
+                        continue
+                    assign[ni, ri, si, di] = True
+                    per_day[ni, di] += 1
+                    per_week[ni] += 1
+                    on_shift[ni, di, si] = True
+                    served[di, ri, si] += 1
+    return assign
 
 
 def solve_schedule_ortools(
@@ -50,192 +125,261 @@ def solve_schedule_ortools(
     enforce_rest_night_to_day: bool = True,
     charge_rooms_tags: Set[str] = frozenset({"ICU", "ER"}),
     require_cnor_in_or: bool = True,
+    log_search_progress: bool = False,
 ) -> Tuple[pd.DataFrame, Dict]:
 
-    nurses_df = nurses_df.copy()
-    rooms_df = rooms_df.copy()
-    demand_df = demand_df.copy()
-    pref_df = pref_df.copy()
-    locks_df = locks_df.copy()
-
-    nurses_df["qual_set"] = nurses_df["qualifications"].apply(parse_semicolon_set)
-    rooms_df["req_set"] = rooms_df["required_qualifications"].apply(parse_semicolon_set)
+    # Only nurses/rooms gain derived columns; assign() returns new frames so the
+    # caller's data is untouched. demand/pref/locks are read-only here.
+    nurses_df = nurses_df.assign(qual_set=parse_semicolon_column(nurses_df["qualifications"]))
+    rooms_df = rooms_df.assign(req_set=parse_semicolon_column(rooms_df["required_qualifications"]))
 
     nurse_ids = nurses_df["nurse_id"].astype(str).tolist()
     room_ids = rooms_df["room_id"].astype(str).tolist()
 
-    max_per_day = {r["nurse_id"]: int(r["max_shifts_per_day"]) for _, r in nurses_df.iterrows()}
-    max_per_week = {r["nurse_id"]: int(r["max_shifts_per_week"]) for _, r in nurses_df.iterrows()}
-    cert_by_nurse = {r["nurse_id"]: ("" if pd.isna(r["certification"]) else str(r["certification"])) for _, r in nurses_df.iterrows()}
-    qual_by_nurse = {r["nurse_id"]: r["qual_set"] for _, r in nurses_df.iterrows()}
-
-    req_by_room = {r["room_id"]: r["req_set"] for _, r in rooms_df.iterrows()}
-    tag_by_room = {r["room_id"]: ("" if pd.isna(r.get("tags", "")) else str(r.get("tags", ""))) for _, r in rooms_df.iterrows()}
-
-    # demand[(day, room, shift)]
-    demand = {}
-    for _, r in demand_df.iterrows():
-        demand[(str(r["day"]), str(r["room_id"]), str(r["shift"]))] = int(r["required_nurses"])
-    for d in days:
-        for rid in room_ids:
-            for sh in shifts:
-                demand.setdefault((d, rid, sh), 0)
+    # Integer id maps: x and the indexes below are keyed by int tuples,
+    # which hash much cheaper than tuples of strings
+    n2i = {n: i for i, n in enumerate(nurse_ids)}
+    r2i = {rid: i for i, rid in enumerate(room_ids)}
+    s2i = {sh: i for i, sh in enumerate(shifts)}
+    d2i = {d: i for i, d in enumerate(days)}
+    N, R, S, D = len(nurse_ids), len(room_ids), len(shifts), len(days)
+
+    # Per-nurse / per-room attributes, indexed by ni / ri
+    max_per_day = nurses_df["max_shifts_per_day"].astype(int).tolist()
+    max_per_week = nurses_df["max_shifts_per_week"].astype(int).tolist()
+    cert_by_nurse = ["" if pd.isna(c) else str(c) for c in nurses_df["certification"]]
+    qual_by_nurse = nurses_df["qual_set"].tolist()
+
+    req_by_room = rooms_df["req_set"].tolist()
+    tags = rooms_df["tags"] if "tags" in rooms_df.columns else [""] * R
+    tag_by_room = ["" if pd.isna(t) else str(t) for t in tags]
+
+    # demand[di, ri, si]; cells without a demand row stay 0
+    demand = np.zeros((D, R, S), dtype=np.int32)
+    for d, rid, sh, req in zip(
+        demand_df["day"].astype(str), demand_df["room_id"].astype(str),
+        demand_df["shift"].astype(str), demand_df["required_nurses"],
+    ):
+        if d in d2i and rid in r2i and sh in s2i:
+            demand[d2i[d], r2i[rid], s2i[sh]] = int(req)
 
     pref = pref_lookup(pref_df)
     locks = locks_lookup(locks_df)
+    pref_i = {
+        (n2i[n], d2i[d], s2i[sh]): p
+        for (n, d, sh), p in pref.items()
+        if p and n in n2i and d in d2i and sh in s2i
+    }
 
-    def feasible(n: str, rid: str) -> bool:
-        return req_by_room[rid].issubset(qual_by_nurse[n])
+    # Nurses qualified for each room, in nurse_ids order
+    feas_by_room = [
+        [ni for ni in range(N) if req_by_room[ri].issubset(qual_by_nurse[ni])]
+        for ri in range(R)
+    ]
 
     model = cp_model.CpModel()
 
-    # x[n, r, sh, d] ∈ {0,1} only if feasible
-    x: Dict[Tuple[str, str, str, str], cp_model.IntVar] = {}
-    for n in nurse_ids:
-        for rid in room_ids:
-            if not feasible(n, rid):
-                continue
-            for sh in shifts:
-                for d in days:
-                    x[(n, rid, sh, d)] = model.NewBoolVar(f"x_{n}_{rid}_{sh}_{d}")
+    # x[ni, ri, si, di] ∈ {0,1} only if feasible
+    x: Dict[Tuple[int, int, int, int], cp_model.IntVar] = {}
+    # Inverted indexes over x, filled as variables are created, so constraint
+    # loops below don't rescan all of x for every (nurse, day) slice.
+    by_nd: Dict[Tuple[int, int], List[cp_model.IntVar]] = defaultdict(list)
+    by_n: Dict[int, List[cp_model.IntVar]] = defaultdict(list)
+    by_n_night: Dict[Tuple[int, int], List[cp_model.IntVar]] = defaultdict(list)
+    by_n_day: Dict[Tuple[int, int], List[cp_model.IntVar]] = defaultdict(list)
+    by_drs: Dict[Tuple[int, int, int], List[cp_model.IntVar]] = defaultdict(list)
+    by_n_weekend: Dict[int, List[cp_model.IntVar]] = defaultdict(list)
+    by_nds: Dict[Tuple[int, int, int], List[cp_model.IntVar]] = defaultdict(list)
+    weekend_days = {di for di, d in enumerate(days) if d in ("Sat", "Sun")}
+    night_si = s2i.get("Night")
+    day_si = s2i.get("Day")
+    # (key, model variable index) pairs for reading the solution back in bulk
+    key_to_index: List[Tuple[Tuple[int, int, int, int], int]] = []
+    for ri, rid in enumerate(room_ids):
+        for ni in feas_by_room[ri]:
+            n = nurse_ids[ni]
+            for si, sh in enumerate(shifts):
+                for di, d in enumerate(days):
+                    var = model.NewBoolVar(f"x_{n}_{rid}_{sh}_{d}")
+                    key = (ni, ri, si, di)
+                    x[key] = var
+                    key_to_index.append((key, var.Index()))
+                    by_nd[(ni, di)].append(var)
+                    by_n[ni].append(var)
+                    by_drs[(di, ri, si)].append(var)
+                    by_nds[(ni, di, si)].append(var)
+                    if di in weekend_days:
+                        by_n_weekend[ni].append(var)
+                    if si == night_si:
+                        by_n_night[(ni, di)].append(var)
+                    elif si == day_si:
+                        by_n_day[(ni, di)].append(var)
 
     # Nurse: max shifts per day
-    for n in nurse_ids:
-        for d in days:
-            vars_nd = [x[k] for k in x if k[0] == n and k[3] == d]
+    for ni in range(N):
+        for di in range(D):
+            vars_nd = by_nd.get((ni, di))
             if vars_nd:
-                model.Add(sum(vars_nd) <= max_per_day[n])
+                model.Add(cp_model.LinearExpr.Sum(vars_nd) <= max_per_day[ni])
 
     # Nurse: max shifts per week (Mon–Sun horizon)
-    for n in nurse_ids:
-        vars_n = [x[k] for k in x if k[0] == n]
+    for ni in range(N):
+        vars_n = by_n.get(ni)
         if vars_n:
-            model.Add(sum(vars_n) <= max_per_week[n])
+            model.Add(cp_model.LinearExpr.Sum(vars_n) <= max_per_week[ni])
 
     # Coverage with slack
     understaff = {}
     overstaff = {}
-    for d in days:
-        for rid in room_ids:
-            for sh in shifts:
-                assigned = [x[(n, rid, sh, d)] for n in nurse_ids if (n, rid, sh, d) in x]
-                assigned_sum = sum(assigned) if assigned else 0
-                u = model.NewIntVar(0, 100, f"under_{rid}_{sh}_{d}")
-                understaff[(d, rid, sh)] = u
+    for di, d in enumerate(days):
+        for ri, rid in enumerate(room_ids):
+            for si, sh in enumerate(shifts):
+                assigned = by_drs.get((di, ri, si), [])
+                dem = int(demand[di, ri, si])
+                if dem == 0 and not assigned:
+                    continue
+                assigned_sum = cp_model.LinearExpr.Sum(assigned)
+                # Slack is bounded by what can actually occur in this cell; no
+                # understaff var is needed when nothing is demanded.
+                slack = 0
+                if dem > 0:
+                    u = model.NewIntVar(0, dem, f"under_{rid}_{sh}_{d}")
+                    understaff[(di, ri, si)] = u
+                    slack += u
                 if allow_overstaff:
-                    o = model.NewIntVar(0, 100, f"over_{rid}_{sh}_{d}")
-                    overstaff[(d, rid, sh)] = o
-                    model.Add(assigned_sum + u - o == demand[(d, rid, sh)])
-                else:
-                    model.Add(assigned_sum + u == demand[(d, rid, sh)])
+                    o = model.NewIntVar(0, len(assigned), f"over_{rid}_{sh}_{d}")
+                    overstaff[(di, ri, si)] = o
+                    slack -= o
+                model.Add(assigned_sum + slack == dem)
 
     # Rest rule: no Night -> Day next day (per nurse)
-    if enforce_rest_night_to_day and ("Night" in shifts) and ("Day" in shifts):
-        day_index = {d: i for i, d in enumerate(days)}
-        inv_day = {i: d for d, i in day_index.items()}
-
-        for n in nurse_ids:
-            for i in range(len(days) - 1):
-                d = inv_day[i]
-                d_next = inv_day[i + 1]
-
-                night_vars = [x[k] for k in x if k[0] == n and k[2] == "Night" and k[3] == d]
-                day_vars_next = [x[k] for k in x if k[0] == n and k[2] == "Day" and k[3] == d_next]
+    rest_rule = enforce_rest_night_to_day and night_si is not None and day_si is not None
+    if rest_rule:
+        for ni in range(N):
+            for di in range(D - 1):
+                night_vars = by_n_night.get((ni, di))
+                day_vars_next = by_n_day.get((ni, di + 1))
 
                 if night_vars and day_vars_next:
-                    model.Add(sum(night_vars) + sum(day_vars_next) <= 1)
+                    model.AddAtMostOne(night_vars + day_vars_next)
 
     # Charge nurse requirement per shift/day in ICU + ER:
     # For any (day, shift), sum of assigned charge nurses in those rooms >= 1, IF total demand there > 0
-    charge_nurses = [n for n in nurse_ids if "Charge" in qual_by_nurse[n]]
-    charge_room_ids = [rid for rid in room_ids if tag_by_room.get(rid, "") in charge_rooms_tags]
-
-    if charge_room_ids and charge_nurses:
-        for d in days:
-            for sh in shifts:
-                total_demand = sum(demand[(d, rid, sh)] for rid in charge_room_ids)
+    charge_nurses = frozenset(ni for ni in range(N) if "Charge" in qual_by_nurse[ni])
+    charge_rooms = [ri for ri in range(R) if tag_by_room[ri] in charge_rooms_tags]
+    charge_by_room = {ri: [ni for ni in feas_by_room[ri] if ni in charge_nurses] for ri in charge_rooms}
+
+    if charge_rooms and charge_nurses:
+        for di in range(D):
+            for si in range(S):
+                total_demand = int(demand[di, charge_rooms, si].sum())
                 if total_demand <= 0:
                     continue
-                charge_assigned = []
-                for rid in charge_room_ids:
-                    for n in charge_nurses:
-                        key = (n, rid, sh, d)
-                        if key in x:
-                            charge_assigned.append(x[key])
+                charge_assigned = [x[(ni, ri, si, di)] for ri in charge_rooms for ni in charge_by_room[ri]]
                 if charge_assigned:
-                    model.Add(sum(charge_assigned) >= 1)
+                    model.AddBoolOr(charge_assigned)
 
     # Skill mix: if OR room is staffed (demand>0), at least one assigned nurse must have CNOR certification
     if require_cnor_in_or:
-        or_room_ids = [rid for rid in room_ids if tag_by_room.get(rid, "") == "OR"]
-        for d in days:
-            for rid in or_room_ids:
-                for sh in shifts:
-                    if demand[(d, rid, sh)] <= 0:
+        or_rooms = [ri for ri in range(R) if tag_by_room[ri] == "OR"]
+        cnor_nurses = frozenset(ni for ni in range(N) if cert_by_nurse[ni] == "CNOR")
+        cnor_by_room = {ri: [ni for ni in feas_by_room[ri] if ni in cnor_nurses] for ri in or_rooms}
+        for di in range(D):
+            for ri in or_rooms:
+                for si in range(S):
+                    if demand[di, ri, si] <= 0:
                         continue
-                    cnor_vars = []
-                    for n in nurse_ids:
-                        if cert_by_nurse[n] == "CNOR":
-                            key = (n, rid, sh, d)
-                            if key in x:
-                                cnor_vars.append(x[key])
+                    cnor_vars = [x[(ni, ri, si, di)] for ni in cnor_by_room[ri]]
                     # If OR is running and there is any feasible CNOR, require ≥1
                     if cnor_vars:
-                        model.Add(sum(cnor_vars) >= 1)
+                        model.AddBoolOr(cnor_vars)
 
     # Locks: enforce x=1 for locked rows (hard)
+    locked_keys: List[Tuple[int, int, int, int]] = []
     for (d, sh, rid, n), locked in locks.items():
         if locked != 1:
             continue
-        key = (n, rid, sh, d)
+        key = (n2i.get(n), r2i.get(rid), s2i.get(sh), d2i.get(d))
         if key not in x:
             raise RuntimeError(f"Locked assignment infeasible (qualification mismatch or unknown IDs): {d},{sh},{rid},{n}")
         model.Add(x[key] == 1)
+        locked_keys.append(key)
 
     # Fairness: penalize deviation from target weekly shifts per nurse (optional)
     fairness_dev = {}
     if target_shifts_per_nurse_week is not None:
-        for n in nurse_ids:
+        for ni, n in enumerate(nurse_ids):
             total = model.NewIntVar(0, 1000, f"tot_{n}")
-            vars_n = [x[k] for k in x if k[0] == n]
-            model.Add(total == (sum(vars_n) if vars_n else 0))
+            vars_n = by_n.get(ni)
+            model.Add(total == cp_model.LinearExpr.Sum(vars_n or []))
             dev = model.NewIntVar(0, 1000, f"dev_{n}")
             model.Add(dev >= total - target_shifts_per_nurse_week)
             model.Add(dev >= target_shifts_per_nurse_week - total)
-            fairness_dev[n] = dev
+            fairness_dev[ni] = dev
 
     # Objective: maximize preferences, minimize slack + fairness + optional weekend aversion
-    obj = []
+    # (collected as parallel var/coeff lists for a single WeightedSum)
+    obj_vars = []
+    obj_coeffs = []
 
-    # Preferences reward
-    for (n, rid, sh, d), var in x.items():
-        p = int(pref.get((n, d, sh), 0))
-        if p:
-            obj.append(weights.w_pref * p * var)
+    # Preferences reward: one term per (nurse, day, shift) preference, summed over rooms
+    for (ni, di, si), p in pref_i.items():
+        vars_nds = by_nds.get((ni, di, si))
+        if vars_nds:
+            obj_vars.append(cp_model.LinearExpr.Sum(vars_nds))
+            obj_coeffs.append(weights.w_pref * p)
 
     # Under/over staffing penalties
-    for (d, rid, sh), u in understaff.items():
-        obj.append(-weights.w_understaff * u)
+    for u in understaff.values():
+        obj_vars.append(u)
+        obj_coeffs.append(-weights.w_understaff)
     if allow_overstaff:
-        for (d, rid, sh), o in overstaff.items():
-            obj.append(-weights.w_overstaff * o)
+        for o in overstaff.values():
+            obj_vars.append(o)
+            obj_coeffs.append(-weights.w_overstaff)
 
     # Fairness penalties
     for dev in fairness_dev.values():
-        obj.append(-weights.w_fairness * dev)
+        obj_vars.append(dev)
+        obj_coeffs.append(-weights.w_fairness)
 
-    # Weekend penalty (soft): discourage Sat/Sun assignments slightly
-    weekend_days = {d for d in days if d in ("Sat", "Sun")}
+    # Weekend penalty (soft): discourage Sat/Sun assignments slightly,
+    # one aggregate weekend-count term per nurse
     if weekend_days and weights.w_weekend > 0:
-        for (n, rid, sh, d), var in x.items():
-            if d in weekend_days:
-                obj.append(-weights.w_weekend * var)
-
-    model.Maximize(sum(obj))
+        for ni, vars_wk in by_n_weekend.items():
+            wknd_n = model.NewIntVar(0, len(vars_wk), f"wk_{nurse_ids[ni]}")
+            model.Add(wknd_n == cp_model.LinearExpr.Sum(vars_wk))
+            obj_vars.append(wknd_n)
+            obj_coeffs.append(-weights.w_weekend)
+
+    model.Maximize(cp_model.LinearExpr.WeightedSum(obj_vars, obj_coeffs))
+
+    # Warm start: hint a greedy schedule and the slack it leaves behind
+    feas = np.zeros((N, R), dtype=np.bool_)
+    for ri in range(R):
+        feas[feas_by_room[ri], ri] = True
+    hinted = greedy_assignment(
+        feas,
+        demand,
+        np.asarray(max_per_day, dtype=np.int32),
+        np.asarray(max_per_week, dtype=np.int32),
+        np.asarray(locked_keys, dtype=np.int64).reshape(-1, 4),
+        night_si if rest_rule else -1,
+        day_si if rest_rule else -1,
+    )
+    for key, var in x.items():
+        model.AddHint(var, int(hinted[key]))
+    # served[di, ri, si] under the hinted schedule
+    served_by_cell = hinted.sum(axis=0).transpose(2, 0, 1)
+    for k, u in understaff.items():
+        model.AddHint(u, max(0, int(demand[k]) - int(served_by_cell[k])))
+    for k, o in overstaff.items():
+        model.AddHint(o, max(0, int(served_by_cell[k]) - int(demand[k])))
 
     solver = cp_model.CpSolver()
     solver.parameters.max_time_in_seconds = float(time_limit_seconds)
-    solver.parameters.num_search_workers = 8
+    solver.parameters.num_search_workers = max(1, os.cpu_count() or 8)
+    solver.parameters.log_search_progress = log_search_progress
 
     status = solver.Solve(model)
 
@@ -244,25 +388,38 @@ def solve_schedule_ortools(
         "objective": solver.ObjectiveValue() if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None,
     }
 
+    solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    # Solution values indexed by model variable index (avoids a solver.Value call per var)
+    sol = list(solver.ResponseProto().solution) if solved else []
+
+    def slack_value(slack_vars: Dict, key: Tuple[int, int, int]) -> int:
+        v = slack_vars.get(key)
+        return int(sol[v.Index()]) if v is not None else 0
+
+    # Group assigned nurses by (di, ri, si) in one pass over x
+    assigned_by_key: Dict[Tuple[int, int, int], List[str]] = defaultdict(list)
+    if solved:
+        for (ni, ri, si, di), idx in key_to_index:
+            if sol[idx]:
+                assigned_by_key[(di, ri, si)].append(nurse_ids[ni])
+
+    room_names = rooms_df["room_name"].tolist()
+
     # Output schedule rows: each (day, room, shift) with assigned nurse list
     out = []
-    for d in days:
-        for rid in room_ids:
-            for sh in shifts:
-                assigned = []
-                for n in nurse_ids:
-                    key = (n, rid, sh, d)
-                    if key in x and solver.Value(x[key]) == 1:
-                        assigned.append(n)
+    for di, d in enumerate(days):
+        for ri, rid in enumerate(room_ids):
+            for si, sh in enumerate(shifts):
+                k = (di, ri, si)
                 out.append({
                     "day": d,
                     "room_id": rid,
-                    "room_name": rooms_df.loc[rooms_df["room_id"] == rid, "room_name"].iloc[0],
+                    "room_name": room_names[ri],
                     "shift": sh,
-                    "required_nurses": demand[(d, rid, sh)],
-                    "assigned_nurses": ";".join(assigned),
-                    "understaff": int(solver.Value(understaff[(d, rid, sh)])) if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None,
-                    "overstaff": int(solver.Value(overstaff[(d, rid, sh)])) if allow_overstaff and status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None,
+                    "required_nurses": int(demand[k]),
+                    "assigned_nurses": ";".join(assigned_by_key.get(k, [])),
+                    "understaff": slack_value(understaff, k) if solved else None,
+                    "overstaff": slack_value(overstaff, k) if allow_overstaff and solved else None,
                 })
 
     schedule_df = pd.DataFrame(out)